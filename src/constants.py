@@ -1,7 +1,7 @@
 import sys
 sys.path.append('./')
 
-import torch
+import re
 
 
 ############################
@@ -12,6 +12,46 @@ import torch
 SCRAPER_INFO_FILE_PATH = "./data/input/maalaang.csv"
 SCRAPER_SAVE_FOLDER_PATH = f"./data/scraped/"
 SCRAPER_BROWSER = "chromium"
+SCRAPER_STORAGE_STATE_FOLDER_PATH = "./data/storage_state/"
+# url -> content hash of the last saved scrape, used to skip pages that did not change between runs.
+SCRAPER_STATE_FILE_PATH = "./data/scrape_state.json"
+SCRAPER_REUSE_MANIFEST_NAME = "reused_pages.json"
+SCRAPER_CONCURRENCY = 8
+SCRAPER_PAGE_CONCURRENCY = 6
+SCRAPER_SCROLL_INTERVAL_MS = 1_500
+SCRAPER_SCROLL_STABLE_CHECKS = 3
+SCRAPER_SCROLL_MAX_MS = 120_000
+# scrolls to the bottom until the page height is unchanged for `stableChecks` checks in a row, or `maxMs` has passed.
+SCRAPER_SCROLL_TO_BOTTOM_JS = """
+async ([intervalMs, stableChecks, maxMs]) => {
+    const deadline = Date.now() + maxMs;
+    let lastHeight = 0, stable = 0;
+    while (stable < stableChecks && Date.now() < deadline) {
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+        const height = document.body.scrollHeight;
+        if (height === lastHeight) {
+            stable++;
+        } else {
+            stable = 0;
+            lastHeight = height;
+        }
+    }
+}
+"""
+SCRAPER_PAGE_FILE_NAME = "index.html"
+SCRAPER_ARCHIVE_NAME = "pages.tar.zst"
+SCRAPER_ARCHIVE_ZSTD_LEVEL = 10
+ENCODE_IMAGE_CHUNK_SIZE = 57 * 1024
+# stylesheets are kept since some career pages need CSS for their JS-rendered listings.
+SCRAPER_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# static pages without `needs_js` set are fetched over plain HTTP instead of through Chromium.
+SCRAPER_HTTP_TIMEOUT = 20
+SCRAPER_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
 
 
 ##############################
@@ -19,15 +59,24 @@ SCRAPER_BROWSER = "chromium"
 ##############################
 
 # MODEL
+EXTRACTOR_BACKEND = "hf" # "hf" or "vllm"
 # TUNED_MODEL = "./models/maalaang/Llama-3.2-1B_DoRA_True_html-extractor_v1-2-maalaang/checkpoint-1950"
 TUNED_MODEL = "Jiraya/crispjobs-com-HTJ-1B-adapters"
 HF_MODEL = "meta-llama/Llama-3.2-1B"
 DEVICE_MAP = "auto"
 LOW_CPU_MEM_USAGE = True
 RETURN_DICT = True
-TORCH_DTYPE = torch.float16
+TORCH_DTYPE = "auto" # name of a torch dtype; "auto" picks bfloat16 on Ampere+ GPUs and float16 otherwise
+ATTN_IMPLEMENTATION = "flash_attention_2" # falls back to "sdpa" without flash-attn
+LOAD_IN_4BIT = False
+COMPILE_MODEL = False
+CACHE_PROMPT_PREFIX = True
+PAD_TO_MULTIPLE_OF = 512
 MAX_NEW_TOKENS = 2_500
-TEMPERATURE = 0.5
+TEMPERATURE = 0.0 # greedy; only read by the vLLM backend, transformers always decodes greedily
+EXTRACTOR_STOP_STRINGS = ["}]"]
+MAX_INPUT_TOKENS = 4_096
+EXTRACTOR_BATCH_SIZE = 16
 EXTRACTOR_BUFFER = 1_000
 
 # TOKENIZER
@@ -76,12 +125,17 @@ LINK_PREPEND = {
 }
 
 FRONTEND_DATA_PATH = "./data/extracted_data/"
+POST_READ_WORKERS = 16
+PARQUET_COMPRESSION = "zstd"
+PARQUET_COMPRESSION_LEVEL = 3
+PARQUET_CATEGORY_COLUMNS = ["company_name"]
+IRRELEVANT_TITLE_RE = re.compile("technician", re.IGNORECASE)
 
 MASTER_DF_FILE_NAME = "extract.parquet"
 OLD_JOB_DATABASE_FILE_NAME = "job_database.parquet"
 
-UNITED_STATES_LIST = ["united", "states", "america", "usa", "us"]
-COUNTRY_SET = {'afghanistan',
+UNITED_STATES_SET = frozenset({"united", "states", "america", "usa", "us"})
+COUNTRY_SET = frozenset({'afghanistan',
  'albania',
  'algeria',
  'andorra',
@@ -275,4 +329,8 @@ COUNTRY_SET = {'afghanistan',
  'vietnam',
  'yemen',
  'zambia',
- 'zimbabwe'}
\ No newline at end of file
+ 'zimbabwe'})
+
+# compiled once at import and matched against lowercased locations; longest names are tried first.
+UNITED_STATES_RE = re.compile("|".join(re.escape(keyword) for keyword in sorted(UNITED_STATES_SET, key=len, reverse=True)))
+COUNTRY_RE = re.compile("|".join(re.escape(country) for country in sorted(COUNTRY_SET, key=len, reverse=True)))
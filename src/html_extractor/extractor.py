@@ -6,13 +6,20 @@ import src.constants as c
 import src.utils as u
 
 import os
+import copy
 import json
+import mmap
+import shutil
+import orjson
 
 import torch
 from transformers import (
     AutoModelForCausalLM,
     AutoTokenizer,
+    BatchEncoding,
+    BitsAndBytesConfig,
 )
+from transformers.utils import is_flash_attn_2_available
 from peft import PeftModel
 from tqdm import tqdm
 from pathlib import Path
@@ -33,7 +40,14 @@ class career_page_html_extractor(EXTRACTOR):
         extracted_foler_path (str): Directory path to store extracted JSON/text outputs (output).
         model (transformers.PreTrainedModel): The fine-tuned language model used for inference.
         tokenizer (transformers.PreTrainedTokenizer): Tokenizer used to encode/decode prompts.
+        prompt_prefix_ids (list[int]): Token ids of `EXTRACTOR_PROMPT` before the HTML slot, with BOS.
+        prompt_suffix_ids (list[int]): Token ids of `EXTRACTOR_PROMPT` after the HTML slot.
+        prompt_prefix_cache (transformers.Cache): KV cache of `prompt_prefix_ids`, reused by every generate call.
+        llm (vllm.LLM): vLLM engine used instead of `model` when `EXTRACTOR_BACKEND` is "vllm".
+        lora_request (vllm.lora.request.LoRARequest): Adapter request passed to every vLLM generate call.
+        sampling_params (vllm.SamplingParams): Generation settings for the vLLM engine.
         old_extract_df (pd.DataFrame): Optional placeholder to hold older extractions (not yet in use).
+        created_folder_paths (set[Path]): Output folders already created in this run, so each is only made once.
     """
 
     def __init__(self, split_folder_path:str, extracted_foler_path:str):
@@ -49,29 +63,24 @@ class career_page_html_extractor(EXTRACTOR):
         self.extracted_foler_path = extracted_foler_path
         self.model = None
         self.tokenizer = None
+        self.prompt_prefix_ids = None
+        self.prompt_suffix_ids = None
+        self.prompt_prefix_cache = None
+        self.llm = None
+        self.lora_request = None
+        self.sampling_params = None
         self.old_extract_df = None
+        self.created_folder_paths = set()
     
-    def make_folder(self, folder_path:str) -> None:
-        """
-        Creates the specified folder path.
-
-        Args:
-            folder_path (str): The directory path to create.
-        """
-        
-        os.makedirs(folder_path, exist_ok=True)
-
     def folder_exists_or_mk(self, folder_path:str) -> None:
         """
-        Checks if a folder exists and creates it if it doesn't.
+        Creates a folder, along with any missing parents, if it doesn't exist.
 
         Args:
             folder_path (str): Path to check and create if necessary.
         """
 
-        if os.path.exists(folder_path) and os.path.isdir(folder_path):
-            return
-        self.make_folder(folder_path=folder_path)
+        Path(folder_path).mkdir(parents=True, exist_ok=True)
 
     def data_software_contents(self, company_folder_path:str, data_software:str) -> (list[str] | list):
         """
@@ -85,49 +94,172 @@ class career_page_html_extractor(EXTRACTOR):
             list[str] | list: List of filenames, or empty list if folder not found.
         """
 
-        if data_software in os.listdir(company_folder_path):
-            return os.listdir(Path(company_folder_path) / data_software)
-        return []
+        try:
+            with os.scandir(Path(company_folder_path) / data_software) as entries:
+                return [entry.name for entry in entries]
+        except (FileNotFoundError, NotADirectoryError):
+            return []
     
-    def find_substring(self, substring:str, _string_:str) -> list[int]:
+    def find_substring(self, substring:(str | bytes), _string_:(str | bytes | mmap.mmap)) -> list[int]:
         """
         Finds all positions of a substring within a string, returning start indices.
 
+        Works the same on `str`, `bytes` and memory-mapped files.
+
         Args:
-            substring (str): Substring to search for.
-            _string_ (str): Full string to search within.
+            substring (str | bytes): Substring to search for.
+            _string_ (str | bytes | mmap.mmap): Full string to search within.
 
         Returns:
             list[int]: List of starting indices where the substring is found.
         """
 
-        split_string = _string_.split(substring)
-        return_pos = []; offset = 0
-        for s in split_string[:-1]:
-            return_pos.append(len(s)+offset)
-            offset += len(substring) + len(s)
+        return_pos = []
+        pos = _string_.find(substring)
+        while pos != -1:
+            return_pos.append(pos)
+            pos = _string_.find(substring, pos + len(substring))
         return return_pos
     
+    def return_chunk_bounds(self, important_pos:list[int], content_length:int) -> list[tuple[int, int]]:
+        """
+        Turns anchor positions into non-overlapping (start, end) slices of `EXTRACTOR_BUFFER` characters around them.
+
+        Anchors closer than `2 * EXTRACTOR_BUFFER` to the previous anchor are merged into its chunk.
+        A chunk is closed once it spans `2 * EXTRACTOR_BUFFER` from its first anchor, to keep prompts
+        bounded on anchor-dense pages; the next slice then starts where the previous one ended, so no
+        part of the HTML is sent to the model twice.
+
+        Args:
+            important_pos (list[int]): Sorted anchor positions from `find_substring`.
+            content_length (int): Length of the HTML the positions refer to.
+
+        Returns:
+            list[tuple[int, int]]: Slice bounds, one per chunk to generate on.
+        """
+
+        anchor_groups = []
+        for pos in important_pos:
+            if anchor_groups and pos - anchor_groups[-1][1] < 2*c.EXTRACTOR_BUFFER and pos - anchor_groups[-1][0] < 2*c.EXTRACTOR_BUFFER:
+                anchor_groups[-1][1] = pos
+            else:
+                anchor_groups.append([pos, pos])
+
+        chunk_bounds = []
+        prev_end = 0
+        for first, last in anchor_groups:
+            start = max(prev_end, first-c.EXTRACTOR_BUFFER)
+            end = min(content_length, last+c.EXTRACTOR_BUFFER)
+            if start < end:
+                chunk_bounds.append((start, end))
+                prev_end = end
+        return chunk_bounds
+
+    def resolve_torch_dtype(self) -> str:
+        """
+        Resolves `TORCH_DTYPE` to the name of the dtype the model is loaded in.
+
+        "auto" picks bfloat16 on Ampere or newer GPUs, where it runs natively, and float16 on
+        older ones (e.g. T4, V100), where bfloat16 is emulated or unsupported.
+
+        Returns:
+            str: Name of a torch dtype, e.g. "bfloat16".
+        """
+
+        if c.TORCH_DTYPE != "auto":
+            return c.TORCH_DTYPE
+        if torch.cuda.is_available() and torch.cuda.get_device_capability()[0] >= 8:
+            return "bfloat16"
+        return "float16"
+
+    def load_vllm_model(self):
+        """
+        Loads the base model into a vLLM engine and registers the PEFT adapter as a LoRA request.
+
+        vLLM gives a paged KV cache and continuous batching across all queued prompts.
+        It is imported here so the Hugging Face backend does not require it.
+
+        Raises:
+            ValueError: If the adapter is a DoRA adapter, which vLLM's LoRA support cannot load.
+        """
+
+        from vllm import LLM, SamplingParams
+        from vllm.lora.request import LoRARequest
+        from huggingface_hub import snapshot_download
+
+        # `TUNED_MODEL` may be a local checkpoint folder instead of a Hugging Face repo id.
+        adapter_path = c.TUNED_MODEL if Path(c.TUNED_MODEL).is_dir() else snapshot_download(c.TUNED_MODEL)
+        with open(Path(adapter_path) / "adapter_config.json") as file:
+            adapter_config = json.load(file)
+        # checked before the engine is built so a DoRA adapter fails fast instead of after loading the base model.
+        if adapter_config.get("use_dora"):
+            raise ValueError(
+                f"{c.TUNED_MODEL} is a DoRA adapter, which vLLM cannot load as a LoRA. "
+                'Set EXTRACTOR_BACKEND = "hf" or merge the adapter into the base model.'
+            )
+
+        # vLLM accepts a fixed set of max LoRA ranks (8, 16, 32, ...), so the adapter rank is rounded up to the next power of two.
+        max_lora_rank = max(8, 1 << (adapter_config["r"] - 1).bit_length())
+        self.llm = LLM(
+            model=c.HF_MODEL,
+            dtype=self.resolve_torch_dtype(),
+            enable_lora=True,
+            max_lora_rank=max_lora_rank,
+            enable_prefix_caching=True,
+        )
+        self.lora_request = LoRARequest("htj", 1, adapter_path)
+        self.sampling_params = SamplingParams(
+            temperature=c.TEMPERATURE,
+            max_tokens=c.MAX_NEW_TOKENS,
+            stop=c.EXTRACTOR_STOP_STRINGS,
+            include_stop_str_in_output=True,
+        )
+
     def load_model(self):
         """
         Loads the base Hugging Face model and applies PEFT fine-tuning weights.
 
         The model is later used for HTML-to-structured-response generation.
+        Delegates to `load_vllm_model` when `EXTRACTOR_BACKEND` is "vllm".
+        With `LOAD_IN_4BIT` the base weights are NF4-quantized and the adapter stays
+        attached, since LoRA weights cannot be merged into 4-bit layers.
+        FlashAttention-2 falls back to PyTorch SDPA when `flash-attn` isn't installed.
         """
 
+        if c.EXTRACTOR_BACKEND == "vllm":
+            self.load_vllm_model()
+            return
+
+        torch_dtype = getattr(torch, self.resolve_torch_dtype())
+        attn_implementation = c.ATTN_IMPLEMENTATION
+        if attn_implementation == "flash_attention_2" and not is_flash_attn_2_available():
+            attn_implementation = "sdpa"
+        quantization_config = None
+        if c.LOAD_IN_4BIT:
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch_dtype,
+            )
         base_model = AutoModelForCausalLM.from_pretrained(
             c.HF_MODEL,
             low_cpu_mem_usage=c.LOW_CPU_MEM_USAGE,
             return_dict=c.RETURN_DICT,
-            torch_dtype=c.TORCH_DTYPE,
+            torch_dtype=torch_dtype,
+            attn_implementation=attn_implementation,
             device_map=c.DEVICE_MAP,
+            quantization_config=quantization_config,
         )
         self.model = PeftModel.from_pretrained(
             base_model,
             c.TUNED_MODEL,
         )
-        self.model = self.model.merge_and_unload()
-        self.model = self.model.to(dtype=torch.float32)
+        if not c.LOAD_IN_4BIT:
+            self.model = self.model.merge_and_unload()
+        if c.COMPILE_MODEL:
+            # a static KV cache keeps decode shapes fixed so the CUDA graphs can be replayed.
+            self.model.generation_config.cache_implementation = "static"
+            self.model.forward = torch.compile(self.model.forward, mode="reduce-overhead", fullgraph=True)
     
     def load_tokenizer(self):
         """
@@ -141,6 +273,12 @@ class career_page_html_extractor(EXTRACTOR):
         )
         self.tokenizer.pad_token = self.tokenizer.eos_token
         self.tokenizer.padding_side = "left"
+
+        # the instruction around the HTML never changes, so it is tokenized once here
+        # and only the HTML chunk is tokenized per prediction.
+        prompt_prefix, prompt_suffix = c.EXTRACTOR_PROMPT.split("{}")
+        self.prompt_prefix_ids = self.tokenizer(prompt_prefix)["input_ids"]
+        self.prompt_suffix_ids = self.tokenizer(prompt_suffix, add_special_tokens=False)["input_ids"]
     
     def initialize(self):
         """
@@ -149,36 +287,123 @@ class career_page_html_extractor(EXTRACTOR):
 
         self.load_model()
         self.load_tokenizer()
+        if c.COMPILE_MODEL and self.llm is None:
+            self.warm_up_model()
+        # the static cache used by the compiled model cannot be seeded with a precomputed prefix.
+        if c.CACHE_PROMPT_PREFIX and not c.COMPILE_MODEL and self.llm is None:
+            self.cache_prompt_prefix()
+
+    def cache_prompt_prefix(self):
+        """
+        Runs the fixed prompt prefix through the model once and keeps its KV cache,
+        so generation only has to prefill the HTML chunk and prompt suffix.
+        """
+
+        with torch.no_grad():
+            prefix_output = self.model(torch.tensor([self.prompt_prefix_ids], device="cuda"), use_cache=True)
+        self.prompt_prefix_cache = prefix_output.past_key_values
+
+    def warm_up_model(self):
+        """
+        Runs one generation on a dummy batch so the compiled graphs are captured
+        before the real prompts are processed.
+        """
+
+        self.make_predictions(html_contents=[""] * c.EXTRACTOR_BATCH_SIZE)
+
+    def return_html_ids(self, html_contents:list[str]) -> list[list[int]]:
+        """
+        Tokenizes HTML snippets and truncates each one so that, wrapped in the prompt prefix
+        and suffix, it fits in `MAX_INPUT_TOKENS`. Both backends build their prompts from these ids.
+
+        Args:
+            html_contents (list[str]): HTML snippets to include in the prompts.
 
-    def return_prompt(self, html_content:str):
+        Returns:
+            list[list[int]]: Truncated token ids of each snippet, without special tokens.
         """
-        Creates a prompt for the LLM using HTML content and a pre-defined template.
+
+        max_html_tokens = c.MAX_INPUT_TOKENS - len(self.prompt_prefix_ids) - len(self.prompt_suffix_ids)
+        html_ids = self.tokenizer(html_contents, add_special_tokens=False)["input_ids"]
+        return [ids[:max_html_tokens] for ids in html_ids]
+
+    def return_prompt_ids(self, html_contents:list[str]):
+        """
+        Builds padded prompt token ids by wrapping each tokenized HTML snippet with the
+        pre-tokenized prompt prefix and suffix.
+
+        When the prefix KV cache is in use, padding goes between the prefix and the HTML
+        so the prefix sits at the same positions in every row and matches the cache.
 
         Args:
-            html_content (str): HTML snippet to include in the prompt.
+            html_contents (list[str]): HTML snippets to include in the prompts.
 
         Returns:
-            str: Formatted prompt to be passed to the model.
+            transformers.BatchEncoding: Padded `input_ids` and `attention_mask` tensors.
         """
 
-        return c.EXTRACTOR_PROMPT.format(html_content)
+        html_ids = self.return_html_ids(html_contents)
+        if self.prompt_prefix_cache is not None:
+            tail_ids = self.tokenizer.pad(
+                {"input_ids": [ids + self.prompt_suffix_ids for ids in html_ids]},
+                return_tensors="pt",
+            )
+            prefix_ids = torch.tensor([self.prompt_prefix_ids]).expand(len(html_contents), -1)
+            return BatchEncoding({
+                "input_ids": torch.cat([prefix_ids, tail_ids["input_ids"]], dim=1),
+                "attention_mask": torch.cat([torch.ones_like(prefix_ids), tail_ids["attention_mask"]], dim=1),
+            })
+        return self.tokenizer.pad(
+            {"input_ids": [self.prompt_prefix_ids + ids + self.prompt_suffix_ids for ids in html_ids]},
+            return_tensors="pt",
+            # bucketed lengths stop the compiled model from being retraced for every new prompt length.
+            pad_to_multiple_of=c.PAD_TO_MULTIPLE_OF if c.COMPILE_MODEL else None,
+        )
 
-    def make_predictions(self, input_ids):
+    def make_predictions(self, html_contents:list[str]) -> list[str]:
         """
-        Performs prediction using the loaded model and tokenizer.
+        Performs batched prediction using the loaded model and tokenizer.
 
         Args:
-            input_ids (dict): Tokenized input prompt.
+            html_contents (list[str]): HTML snippets whose prompts are generated on together.
 
         Returns:
-            str: Decoded text starting from '### Response:' marker.
+            list[str]: Decoded texts starting from '### Response:' marker, one per snippet.
         """
 
+        if self.llm is not None:
+            prompts = [
+                {"prompt_token_ids": self.prompt_prefix_ids + ids + self.prompt_suffix_ids}
+                for ids in self.return_html_ids(html_contents)
+            ]
+            outputs = self.llm.generate(prompts, self.sampling_params, lora_request=self.lora_request)
+            pred_outputs = [output.outputs[0].text for output in outputs]
+            return [pred_output[pred_output.find('### Response:'):] for pred_output in pred_outputs]
+
+        input_ids = self.return_prompt_ids(html_contents)
         input_ids.to("cuda")
-        outputs = self.model.generate(**input_ids, max_new_tokens=c.MAX_NEW_TOKENS, pad_token_id=self.tokenizer.eos_token_id, temperature=c.TEMPERATURE)
-        pred_output = self.tokenizer.decode(outputs[0])
-        pred_response_start_pos = pred_output.find('### Response:')
-        return pred_output[pred_response_start_pos:]
+        past_key_values = None
+        if self.prompt_prefix_cache is not None:
+            # generate extends the cache in place, so every batch gets its own copy.
+            past_key_values = copy.deepcopy(self.prompt_prefix_cache)
+            past_key_values.batch_repeat_interleave(len(html_contents))
+        outputs = self.model.generate(
+            **input_ids,
+            past_key_values=past_key_values,
+            max_new_tokens=c.MAX_NEW_TOKENS,
+            pad_token_id=self.tokenizer.eos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id,
+            stop_strings=c.EXTRACTOR_STOP_STRINGS,
+            tokenizer=self.tokenizer,
+            do_sample=False,
+            num_beams=1,
+            use_cache=True,
+        )
+        pred_responses = []
+        for pred_output in self.tokenizer.batch_decode(outputs, skip_special_tokens=False):
+            pred_response_start_pos = pred_output.find('### Response:')
+            pred_responses.append(pred_output[pred_response_start_pos:])
+        return pred_responses
 
     def read_dict_from_content(self, content:str) -> list:
         """
@@ -193,87 +418,193 @@ class career_page_html_extractor(EXTRACTOR):
 
         if content.startswith("[") and content.endswith("]") and len(content) > 10:
             try:
-                data = json.loads(content)
-                if isinstance(data, list) and all(isinstance(item, dict) for item in data):
-                    return data
-            except json.JSONDecodeError:
-                pass
+                data = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                try:
+                    data = json.loads(content)
+                except json.JSONDecodeError:
+                    return []
+            if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+                return data
         
         return []
 
-    def call_make_predictions(self, company:str, data_software:str, html_file:str) -> list:
+    def chunk_html_content(self, company:str, data_software:str, html_name:str, html_content:(bytes | mmap.mmap)) -> list[tuple[Path, str]]:
         """
-        Performs the full prediction pipeline: reads HTML, checks if relevant,
-        chunks by key token, runs generation, and saves the result.
+        Checks if one HTML page is relevant and chunks it by key token. Only the chunks
+        around anchors are decoded from the raw bytes.
 
         Args:
             company (str): Name of the company whose HTML is being processed.
             data_software (str): Subdirectory or identifier for the job data source.
-            html_file (str): Filename of the raw HTML file to process.
+            html_name (str): Filename of the HTML page, used to name the extracted outputs.
+            html_content (bytes | mmap.mmap): Raw, UTF-8 encoded HTML of the page.
 
         Returns:
-            list: Currently returns an empty list (can be extended to return JSONs).
+            list[tuple[Path, str]]: (save_location, html_content_split) pairs to be queued for generation.
         """
 
-        should_i_make_preds = True
-        html_content = u.read_html(
-            HTML_file_path = Path(self.split_folder_path) / company / data_software / html_file
-        )
-        if company in c.EXTRACTOR_CHECK and c.EXTRACTOR_CHECK[company] not in html_content:
-            should_i_make_preds = False
-        if should_i_make_preds:
-
-            important_pos = self.find_substring(substring=c.EXTRACTOR_CHECK[company], _string_=html_content)
-            for ix, pos in enumerate(important_pos):
-                html_content_split = html_content[max(0, pos-c.EXTRACTOR_BUFFER):min(len(html_content), pos+c.EXTRACTOR_BUFFER)]
-
-                input_prompt = self.return_prompt(html_content_split)
-                input_ids = self.tokenizer(input_prompt, return_tensors="pt")
-                if len(input_prompt) < 100_000:
-                    # try:
-                    pred_response = self.make_predictions(input_ids=input_ids)
-                    self.folder_exists_or_mk(
-                        folder_path = Path(self.extracted_foler_path) / company / data_software
-                    )
-                    u.save_response_as_txt(
-                        save_location = Path(self.extracted_foler_path) / company / data_software / f"extracted_{html_file[:-4]}_part_{ix}.txt",
-                        response = pred_response
-                    )
+        important_pos = self.find_substring(substring=c.EXTRACTOR_CHECK[company].encode('utf-8'), _string_=html_content)
+        if not important_pos:
+            return []
 
-        return []
+        queued_prompts = []
+        html_stem = html_name.rsplit(".", 1)[0]
+        extracted_folder_path = Path(self.extracted_foler_path) / company / data_software
+        for ix, (start, end) in enumerate(self.return_chunk_bounds(important_pos=important_pos, content_length=len(html_content))):
+            html_content_split = html_content[start:end].decode('utf-8', 'replace')
+
+            if len(html_content_split) + len(c.EXTRACTOR_PROMPT) < 100_000:
+                queued_prompts.append((
+                    extracted_folder_path / f"extracted_{html_stem}_part_{ix}.txt",
+                    html_content_split
+                ))
+
+        return queued_prompts
+
+    def call_make_predictions(self, company:str, data_software:str, html_file:str) -> list[tuple[Path, str]]:
+        """
+        Prepares the prediction inputs for one scraped file. Plain HTML files are memory-mapped;
+        paginated scrapes stored as a `SCRAPER_ARCHIVE_NAME` archive are read page by page.
+
+        Args:
+            company (str): Name of the company whose HTML is being processed.
+            data_software (str): Subdirectory or identifier for the job data source.
+            html_file (str): Filename of the raw HTML file or archive to process.
+
+        Returns:
+            list[tuple[Path, str]]: (save_location, html_content_split) pairs to be queued for generation.
+        """
+
+        if not c.EXTRACTOR_CHECK.get(company):
+            return []
+        html_file_path = Path(self.split_folder_path) / company / data_software / html_file
+
+        if html_file == c.SCRAPER_ARCHIVE_NAME:
+            queued_prompts = []
+            for html_name, html_content in u.iter_html_archive(archive_path=html_file_path):
+                queued_prompts.extend(self.chunk_html_content(
+                    company = company,
+                    data_software = data_software,
+                    html_name = html_name,
+                    html_content = html_content
+                ))
+            return queued_prompts
+
+        with u.map_html(HTML_file_path = html_file_path) as html_content:
+            return self.chunk_html_content(
+                company = company,
+                data_software = data_software,
+                html_name = html_file,
+                html_content = html_content
+            )
+
+    def flush_predictions(self, queued_prompts:list[tuple[Path, str]]) -> None:
+        """
+        Runs a batch of queued prompts through the model and saves every response.
+
+        Args:
+            queued_prompts (list[tuple[Path, str]]): (save_location, html_content_split) pairs to generate on.
+        """
+
+        pred_responses = self.make_predictions(html_contents=[html_content_split for _, html_content_split in queued_prompts])
+        for (save_location, _), pred_response in zip(queued_prompts, pred_responses):
+            # folders are only created once a response is ready, so an interrupted run doesn't
+            # leave empty company folders that a resumed run would treat as already extracted.
+            if save_location.parent not in self.created_folder_paths:
+                self.folder_exists_or_mk(folder_path = save_location.parent)
+                self.created_folder_paths.add(save_location.parent)
+            u.save_response_as_txt(
+                save_location = save_location,
+                response = pred_response
+            )
+
+    def queue_predictions(self, queued_prompts:list[tuple[Path, str]], company:str, data_software:str, html_file:str) -> None:
+        """
+        Adds the prompts of one HTML file to the queue and flushes full batches through the model.
+
+        Args:
+            queued_prompts (list[tuple[Path, str]]): Running queue of (save_location, html_content_split) pairs.
+            company (str): Name of the company whose HTML is being processed.
+            data_software (str): Subdirectory or identifier for the job data source.
+            html_file (str): Filename of the raw HTML file to process.
+        """
+
+        queued_prompts.extend(self.call_make_predictions(
+            company = company,
+            data_software = data_software,
+            html_file = html_file
+        ))
+        # vLLM schedules its own batches, so it gets the whole queue in one call at the end.
+        while self.llm is None and len(queued_prompts) >= c.EXTRACTOR_BATCH_SIZE:
+            self.flush_predictions(queued_prompts[:c.EXTRACTOR_BATCH_SIZE])
+            del queued_prompts[:c.EXTRACTOR_BATCH_SIZE]
     
+    def copy_reused_predictions(self):
+        """
+        Copies the extractions of pages the scraper found unchanged since an earlier run
+        (listed in its `SCRAPER_REUSE_MANIFEST_NAME` manifest) from that run's extracted folder,
+        so they don't have to be generated again.
+        """
+
+        manifest_path = Path(self.split_folder_path) / c.SCRAPER_REUSE_MANIFEST_NAME
+        if not manifest_path.exists():
+            return
+        for reused_page in orjson.loads(manifest_path.read_bytes()):
+            from_folder_path = Path(self.extracted_foler_path).parent / reused_page['run'] / reused_page['from_folder']
+            to_folder_path = Path(self.extracted_foler_path) / reused_page['folder']
+            extracted_files = list(from_folder_path.glob(u.extracted_file_pattern(html_file=reused_page['html_file'])))
+            if not extracted_files:
+                print(f"No earlier extraction found to reuse in {from_folder_path}")
+                continue
+            self.folder_exists_or_mk(folder_path = to_folder_path)
+            for extracted_file in extracted_files:
+                shutil.copy2(extracted_file, to_folder_path / extracted_file.name)
+
     def produce_predicts(self):
         """
         Main method to process all HTML files across companies and subfolders.
 
-        Iterates over all files, runs the prediction pipeline, and saves results.
-        Handles both single-level and nested directory structures.
+        Iterates over all files, queues their prompts, runs the prediction pipeline
+        in batches of `EXTRACTOR_BATCH_SIZE`, and saves results.
+        Handles both single-level and nested directory structures. Extractions of
+        pages that were unchanged since an earlier run are copied rather than regenerated.
         """
         
         self.folder_exists_or_mk(folder_path = self.extracted_foler_path)
-        company_list = os.listdir(self.split_folder_path); company_list.sort(); company_list_extracted = os.listdir(self.extracted_foler_path)
-        for company in tqdm(company_list, desc="Extracted Companies"):
-            if company not in company_list_extracted:
-                for data_software in os.listdir(Path(self.split_folder_path) / company):
-                    if os.path.isdir(Path(self.split_folder_path) / company / data_software):
+        queued_prompts = []
+        company_list_extracted = set(os.listdir(self.extracted_foler_path))
+        with os.scandir(self.split_folder_path) as entries:
+            company_entries = sorted((entry for entry in entries if entry.is_dir()), key=lambda entry: entry.name)
+        for company_entry in tqdm(company_entries, desc="Extracted Companies"):
+            if company_entry.name not in company_list_extracted:
+                with os.scandir(company_entry.path) as entries:
+                    data_software_entries = list(entries)
+                for data_software_entry in data_software_entries:
+                    if data_software_entry.is_dir(follow_symlinks=False):
                         data_software_html_paths = self.data_software_contents(
-                            company_folder_path = Path(self.split_folder_path) / company,
-                            data_software = data_software
+                            company_folder_path = company_entry.path,
+                            data_software = data_software_entry.name
                         )
                         data_software_html_paths.sort()
                         for html_file in data_software_html_paths:
-                            self.call_make_predictions(
-                                company = company,
-                                data_software = data_software,
+                            self.queue_predictions(
+                                queued_prompts = queued_prompts,
+                                company = company_entry.name,
+                                data_software = data_software_entry.name,
                                 html_file = html_file
                             )
 
                     else:
-                        self.call_make_predictions(
-                            company = company,
+                        self.queue_predictions(
+                            queued_prompts = queued_prompts,
+                            company = company_entry.name,
                             data_software = "",
-                            html_file = data_software
+                            html_file = data_software_entry.name
                         )
+        if queued_prompts:
+            self.flush_predictions(queued_prompts)
+        self.copy_reused_predictions()
 
 if __name__ == "__main__":
     """
@@ -7,8 +7,10 @@ import src.utils as u
 
 import os
 import json
+import orjson
 import pandas as pd
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 
 
@@ -58,27 +60,15 @@ class post_extraction_cleaner(POST):
         if os.path.exists(self.job_database_df_path):
             self.job_database_df = self.read_df_from_parquet(job_database_df_path)
     
-    def make_folder(self, folder_path:str) -> None:
-        """
-        Creates a directory.
-
-        Args:
-            folder_path (str): Target directory path.
-        """
-
-        os.makedirs(folder_path, exist_ok=True)
-
     def folder_exists_or_mk(self, folder_path:str) -> None:
         """
-        Checks if the directory exists and creates it if it does not.
+        Creates the directory, along with any missing parents, if it does not exist.
 
         Args:
             folder_path (str): Path to check or create.
         """
 
-        if os.path.exists(folder_path) and os.path.isdir(folder_path):
-            return
-        self.make_folder(folder_path=folder_path)
+        os.makedirs(folder_path, exist_ok=True)
     
     def read_txt(self, file_path:str) -> None:
         """
@@ -96,7 +86,9 @@ class post_extraction_cleaner(POST):
     
     def save_df_to_parquet(self, df, file_path:str) -> None:
         """
-        Saves a DataFrame to a Parquet file, creating directories as needed.
+        Saves a DataFrame to a zstd-compressed Parquet file, creating directories as needed.
+
+        Low-cardinality columns are stored as categories to keep the file small.
 
         Args:
             df (pd.DataFrame): DataFrame to save.
@@ -105,7 +97,14 @@ class post_extraction_cleaner(POST):
         
         merged_path = Path(*file_path.parts[:-1])
         self.folder_exists_or_mk(folder_path = merged_path)
-        df.to_parquet(file_path)
+        df = df.astype({column: "category" for column in c.PARQUET_CATEGORY_COLUMNS if column in df.columns})
+        df.to_parquet(
+            file_path,
+            engine="pyarrow",
+            compression=c.PARQUET_COMPRESSION,
+            compression_level=c.PARQUET_COMPRESSION_LEVEL,
+            index=False,
+        )
     
     def read_df_from_parquet(self, file_path: str) -> pd.DataFrame:
         """
@@ -118,83 +117,94 @@ class post_extraction_cleaner(POST):
             pd.DataFrame: Loaded data.
         """
 
-        return pd.read_parquet(file_path)
+        return pd.read_parquet(file_path, engine="pyarrow")
 
-    def read_dict_from_txt(self, content:str, file_path:str) -> list:
+    def read_dict_from_txt(self, content:bytes, file_path:str) -> list:
         """
-        Parses a string as a list of dictionaries if it appears to be valid JSON.
+        Parses raw bytes as a list of dictionaries if they appear to be valid JSON.
+
+        Uses orjson and falls back to the stdlib parser for input orjson rejects.
 
         Args:
-            content (str): JSON string to parse.
+            content (bytes): UTF-8 encoded JSON to parse.
             file_path (str): Path to the original file (for logging/debug, unused here).
 
         Returns:
             list: Parsed list of dictionaries, or an empty list on failure.
         """
 
-        if content.startswith("[") and content.endswith("]") and len(content) > 10:
+        if content.startswith(b"[") and content.endswith(b"]") and len(content) > 10:
             try:
-                data = json.loads(content)
-                if isinstance(data, list) and all(isinstance(item, dict) for item in data):
-                    return data
-            except json.JSONDecodeError:
-                pass
+                data = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                try:
+                    data = json.loads(content)
+                except json.JSONDecodeError:
+                    return []
+            if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+                return data
         
         return []
 
-    def process_file_read_txt(self, file_path:str) -> str:
+    def process_file_read_txt(self, file_path:str) -> bytes:
         """
-        Reads and cleans a text file by removing known start and end markers.
+        Reads a text file as bytes and cleans it by removing known start and end markers.
 
         Args:
             file_path (str): Path to the text file.
 
         Returns:
-            str: Preprocessed content ready for JSON parsing.
+            bytes: Preprocessed content ready for JSON parsing.
         """
 
-        content = self.read_txt(file_path)
-        return content.replace(c.POST_START_TXT, "").replace(c.POST_END_TXT, "").replace("'", '"')
+        with open(file_path, 'rb') as file:
+            content = file.read().strip()
+        return content.replace(c.POST_START_TXT.encode(), b"").replace(c.POST_END_TXT.encode(), b"").replace(b"'", b'"')
 
-    def extract_json_to_df(self, file_path:str, company_name:str):
+    def extract_json_to_df(self, file_path:str, company_name:str) -> list[dict]:
         """
-        Converts one JSON file to a pandas DataFrame and appends it to the master DataFrame.
+        Converts one JSON file to job records tagged with their company.
 
         Args:
             file_path (str): Path to the extracted file.
             company_name (str): Company associated with the extracted file.
+
+        Returns:
+            list[dict]: One record per extracted job, ready to be added to the master DataFrame.
         """
 
         processed_content = self.process_file_read_txt(file_path)
         cur_json = self.read_dict_from_txt(content=processed_content, file_path=file_path)
-        cur_df = pd.DataFrame(cur_json)
-        cur_df['company'] = company_name
-        if self.master_df is not None:
-            self.master_df = pd.concat([self.master_df, cur_df], ignore_index=True)
-        else:
-            self.master_df = cur_df
+        return [{**row, 'company': company_name} for row in cur_json]
     
     def get_job_df(self):
         """
         Iterates over all extracted files and compiles a master DataFrame of job records.
         Handles both flat and nested directory structures.
-        """
 
-        for company in os.listdir(self.extracted_folder_path):
-            for data_software in os.listdir(Path(self.extracted_folder_path) / company):
-                if data_software == 'data' or data_software == 'software':
-                    file_name_list = os.listdir(Path(self.extracted_folder_path) / company / data_software); file_name_list.sort()
-                    for file_name in file_name_list:
-                        # print(self.master_df)
-                        self.extract_json_to_df(
-                            file_path = Path(self.extracted_folder_path) / company / data_software / file_name,
-                            company_name = company,
-                        )
-                else:
-                    self.extract_json_to_df(
-                        file_path = Path(self.extracted_folder_path) / company / data_software,
-                        company_name = company,
-                    )
+        Files are read and parsed on a thread pool and the DataFrame is built once
+        from all records, instead of concatenating one small DataFrame per file.
+        """
+
+        file_paths, company_names = [], []
+        with os.scandir(self.extracted_folder_path) as company_entries:
+            for company_entry in company_entries:
+                with os.scandir(company_entry.path) as data_software_entries:
+                    for data_software_entry in data_software_entries:
+                        if data_software_entry.name == 'data' or data_software_entry.name == 'software':
+                            with os.scandir(data_software_entry.path) as file_entries:
+                                file_name_list = sorted(file_entry.path for file_entry in file_entries)
+                            file_paths.extend(file_name_list)
+                            company_names.extend([company_entry.name] * len(file_name_list))
+                        else:
+                            file_paths.append(data_software_entry.path)
+                            company_names.append(company_entry.name)
+
+        rows = []
+        with ThreadPoolExecutor(max_workers=c.POST_READ_WORKERS) as executor:
+            for records in executor.map(self.extract_json_to_df, file_paths, company_names):
+                rows.extend(records)
+        self.master_df = pd.DataFrame(rows)
     
     def process_master_df(self):
         """
@@ -215,57 +225,37 @@ class post_extraction_cleaner(POST):
             'Job Location': 'location'
         })
         self.master_df = self.master_df.drop_duplicates().reset_index(drop=True)
-        row_to_del = []
-        for idx, r in self.master_df.iterrows():
-            if r['job_link'] is not None and 'http' not in r['job_link']:
-                if r['company_name'] in c.LINK_PREPEND:
-                    self.master_df.loc[idx, 'job_link'] = f"{c.LINK_PREPEND[r['company_name']]}{r['job_link']}"
-                else:
-                    row_to_del.append(idx)
-        self.master_df.drop(row_to_del, inplace=True)
+        relative_link = ~self.master_df['job_link'].str.contains('http', regex=False, na=True)
+        link_prepend = self.master_df['company_name'].map(c.LINK_PREPEND)
+        self.master_df.loc[relative_link & link_prepend.notna(), 'job_link'] = link_prepend + self.master_df['job_link']
+        self.master_df = self.master_df[~(relative_link & link_prepend.isna())]
     
-    def clean_location_field(self):
+    def clean_location_field(self, location_lower:(pd.Series | None)=None):
         """
         Empties the location field for jobs not clearly marked as U.S.-based.
-        """
-
-        for ix, r in self.master_df.iterrows():
-            change = True
-            for keyword in c.UNITED_STATES_LIST:
-                if keyword in  r["location"].lower():
-                    change = False
-            if change:
-                self.master_df.iloc[ix, 2] = ""
-    
-    def location_check_helper(self, row:pd.DataFrame, location_mask:list) -> None:
-        """
-        Updates a boolean mask to exclude jobs with non-U.S. locations.
 
         Args:
-            row (pd.DataFrame): A row in the job listing DataFrame.
-            location_mask (list): The running mask to update.
-
-        Returns:
-            list: Updated mask list.
+            location_lower (pd.Series | None, optional): Lowercased `location` column of `master_df`, as returned
+                by `drop_non_us_jobs`. Recomputed when missing or no longer aligned with `master_df`. Defaults to None.
         """
 
-        for country in c.COUNTRY_SET:
-            if country in row["location"].lower():
-                location_mask = location_mask[:-1]
-                location_mask.append(False)
-                return location_mask
-        return location_mask
+        if location_lower is None or not location_lower.index.equals(self.master_df.index):
+            location_lower = self.master_df["location"].str.lower()
+        us_location = location_lower.str.contains(c.UNITED_STATES_RE, na=False)
+        self.master_df.loc[~us_location, "location"] = ""
     
-    def drop_non_us_jobs(self):
+    def drop_non_us_jobs(self) -> pd.Series:
         """
         Drops all rows from `master_df` that have a location outside of the U.S.
+
+        Returns:
+            pd.Series: Lowercased `location` column of the filtered `master_df`, so `clean_location_field` can reuse it.
         """
         
-        location_mask = []
-        for _, r in self.master_df.iterrows():
-            location_mask.append(True)
-            location_mask = self.location_check_helper(row= r, location_mask = location_mask)
-        self.master_df = self.master_df[location_mask].reset_index(drop=True)
+        location_lower = self.master_df["location"].str.lower()
+        non_us_location = location_lower.str.contains(c.COUNTRY_RE, na=False)
+        self.master_df = self.master_df[~non_us_location].reset_index(drop=True)
+        return location_lower[~non_us_location].reset_index(drop=True)
 
     def remove_old_n_irrelevant_roles(self):
         """
@@ -274,9 +264,11 @@ class post_extraction_cleaner(POST):
         - Job listings already present in the job database (deduplication)
         """
 
-        self.master_df = self.master_df[~self.master_df['job_title'].str.contains('technician', case=False, na=False)]
+        self.master_df = self.master_df[~self.master_df['job_title'].str.contains(c.IRRELEVANT_TITLE_RE, na=False)]
         if self.job_database_df is not None:
-            self.master_df = self.master_df[~self.master_df["job_link"].isin(self.job_database_df["job_link"])]
+            # a unique Index is hashed once for the anti-join instead of probing the full column.
+            known_job_links = pd.Index(self.job_database_df["job_link"].unique())
+            self.master_df = self.master_df[~self.master_df["job_link"].isin(known_job_links)]
     
     def save_files(self):
         """
@@ -301,8 +293,8 @@ class post_extraction_cleaner(POST):
         self.get_job_df()
         self.process_master_df()
         self.remove_old_n_irrelevant_roles()
-        self.drop_non_us_jobs()
-        self.clean_location_field()
+        location_lower = self.drop_non_us_jobs()
+        self.clean_location_field(location_lower=location_lower)
         self.save_files()
     
 if __name__ == "__main__":
@@ -11,6 +11,11 @@ import argparse
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 """
 End-to-End Pipeline: Career Page Job Scraping, Extraction, and Post-Processing
@@ -48,6 +53,7 @@ Arguments:
 Notes:
     - All file/folder locations are defined in `src/constants.py`.
     - Assumes model weights, tokenizer, and PEFT adapter are available locally or from Hugging Face.
+    - The scraper runs on uvloop when it is installed (Linux/macOS); otherwise the default asyncio event loop is used.
 
 Author:
     MLOps Engineering Team
@@ -67,8 +73,15 @@ if __name__ == "__main__":
 
     scraper = career_page_scraper()
     scraper.load_scraping_info(file_path=c.SCRAPER_INFO_FILE_PATH)
+    run_kwargs = {}
+    if uvloop is not None:
+        if sys.version_info >= (3, 12):
+            run_kwargs["loop_factory"] = uvloop.new_event_loop
+        else:
+            uvloop.install()
     asyncio.run(
-        scraper.scrape(browser_name=c.SCRAPER_BROWSER, headless_browser=False, save_folder_path=Path(c.SCRAPER_SAVE_FOLDER_PATH) / timestamp_str)
+        scraper.scrape(browser_name=c.SCRAPER_BROWSER, headless_browser=False, save_folder_path=Path(c.SCRAPER_SAVE_FOLDER_PATH) / timestamp_str),
+        **run_kwargs
     )
     print("Finished scraping data.")
 
@@ -2,13 +2,18 @@ import sys
 sys.path.append('./')
 
 import os
+import csv
+import json
+from pathlib import Path
+from urllib.parse import urlsplit
 
 import src.utils as u
 import src.constants as c
 from src.scraper.base_scraper import SCRAPER
 
 import asyncio
-import pandas as pd
+import httpx
+from playwright.async_api import BrowserContext, async_playwright
 
 class career_page_scraper(SCRAPER):
     """
@@ -20,8 +25,15 @@ class career_page_scraper(SCRAPER):
         SCRAPER (Base class for scraping logic)
 
     Attributes:
-        scraping_info_df (pd.DataFrame): DataFrame loaded from configuration CSV that contains
-            scraping metadata for each company (e.g., URL, pagination type, identifier).
+        scraping_info (list[dict[str, str]]): Rows of the configuration CSV, one dict per company,
+            holding its scraping metadata (e.g., URL, pagination type, identifier).
+        playwright (playwright.async_api.Playwright): Playwright driver started for the current `scrape` run.
+        browser (playwright.async_api.Browser): Chromium browser shared by every company in the current `scrape` run.
+        contexts (dict[str, BrowserContext]): One browser context per domain (netloc), reused across companies and pages.
+        context_lock (asyncio.Lock): Guards `contexts` so concurrent companies don't open duplicate contexts.
+        http_client (httpx.AsyncClient): Keep-alive HTTP/2 client shared by static pages that don't need JavaScript.
+        scrape_state (dict[str, dict]): Content hash, run and location of the last saved scrape of each URL, persisted across runs.
+        reused_pages (list[dict]): Pages of the current run that were unchanged and are reused from an earlier run.
     """
 
     def __init__(self) -> None:
@@ -29,14 +41,21 @@ class career_page_scraper(SCRAPER):
         Initializes the career page scraper object with an empty configuration state.
         """
 
-        self.scraping_info_df = None
+        self.scraping_info = []
+        self.playwright = None
+        self.browser = None
+        self.contexts = {}
+        self.context_lock = None
+        self.http_client = None
+        self.scrape_state = {}
+        self.reused_pages = []
     
-    def make_folder(self, folder_path:str) -> None:
+    def folder_exists_or_mk(self, folder_path:(str | Path)) -> None:
         """
-        Creates a new directory at the specified path.
+        Creates the specified folder, along with any missing parents, if it doesn't exist.
 
         Args:
-            folder_path (str): Path where the new folder should be created.
+            folder_path (str | Path): Directory path to validate or create.
 
         Returns:
             None
@@ -44,122 +63,370 @@ class career_page_scraper(SCRAPER):
 
         os.makedirs(folder_path, exist_ok=True)
     
-    def folder_exists_or_mk(self, folder_path:str) -> None:
+    def load_scraping_info(self, file_path:str) -> None:
         """
-        Checks whether the specified folder path exists. If not, creates it.
+        Loads the scraping configuration from a CSV file as a list of dicts, one per row. The file
+        should include details such as company name, URL, pagination style, and link type.
 
         Args:
-            folder_path (str): Directory path to validate or create.
+            file_path (str): Path to the CSV file containing scraping metadata.
 
         Returns:
             None
         """
 
-        if os.path.exists(folder_path) and os.path.isdir(folder_path):
-            return
-        self.make_folder(folder_path=folder_path)
+        with open(file_path, newline='', encoding='utf-8') as file:
+            self.scraping_info = list(csv.DictReader(file))
     
-    def load_scraping_info(self, file_path:str) -> None:
+    def load_scrape_state(self) -> None:
         """
-        Loads the scraping configuration from a CSV file into a DataFrame. The file
-        should include details such as company name, URL, pagination style, and link type.
+        Loads the content hashes recorded by previous runs from `SCRAPER_STATE_FILE_PATH`, if it exists.
+
+        Returns:
+            None
+        """
+
+        self.scrape_state = {}
+        self.reused_pages = []
+        if os.path.exists(c.SCRAPER_STATE_FILE_PATH):
+            with open(c.SCRAPER_STATE_FILE_PATH) as file:
+                self.scrape_state = json.load(file)
+
+    def save_scrape_state(self, save_folder_path:str) -> None:
+        """
+        Persists the updated content hashes and writes the run's reuse manifest
+        (`SCRAPER_REUSE_MANIFEST_NAME`), which tells the extractor which earlier extractions to copy.
 
         Args:
-            file_path (str): Path to the CSV file containing scraping metadata.
+            save_folder_path (str): Root directory of the current run.
 
         Returns:
             None
         """
 
-        self.scraping_info_df = pd.read_csv(file_path)
-    
-    async def call_scrape_link_manu_wi_chromium(self, headless_browser:bool, r:any, folder_path:str) -> None:
+        self.folder_exists_or_mk(folder_path=os.path.dirname(c.SCRAPER_STATE_FILE_PATH))
+        with open(c.SCRAPER_STATE_FILE_PATH, "w") as file:
+            json.dump(self.scrape_state, file)
+        self.folder_exists_or_mk(folder_path=save_folder_path)
+        with open(Path(save_folder_path) / c.SCRAPER_REUSE_MANIFEST_NAME, "w") as file:
+            json.dump(self.reused_pages, file)
+
+    def previous_extraction_exists(self, previous:dict) -> bool:
         """
-        Wrapper to call the paginated scraper function using Chromium for a given row of scraping metadata.
+        Checks that the run a page was last saved in also produced extractions for it. Pages are
+        only skipped when there is something to reuse; otherwise they are saved and extracted again.
+
+        Args:
+            previous (dict): The page's entry in `scrape_state`.
+
+        Returns:
+            bool: True if the earlier run's extracted folder holds outputs for the page.
+        """
+
+        extracted_folder_path = Path(c.EXTACTED_FOLDER_PATH) / previous['run'] / previous['folder']
+        return any(extracted_folder_path.glob(u.extracted_file_pattern(html_file=previous['html_file'])))
+
+    def record_page(self, r:dict, save_folder_path:str, save_dir:Path, html_file:str, html_sha256:(str | None), previous_sha256:(str | None)) -> None:
+        """
+        Records the outcome of scraping one row. Pages whose hash matches `previous_sha256` were not
+        saved again, so they are added to the reuse manifest; pages that were saved become the new reference.
+
+        Args:
+            r (dict[str, str]): A row of the scraping metadata, keyed by CSV column.
+            save_folder_path (str): Root directory of the current run.
+            save_dir (Path): Directory the row's HTML is saved in.
+            html_file (str): Name of the HTML file or archive the row is saved as.
+            html_sha256 (str | None): Content hash returned by the scraping helper, or None if scraping failed.
+            previous_sha256 (str | None): Hash the helper compared against, or None if the page was always saved.
+
+        Returns:
+            None
+        """
+
+        if html_sha256 is None:
+            return
+        folder = save_dir.relative_to(save_folder_path).as_posix()
+        if previous_sha256 is not None and html_sha256 == previous_sha256:
+            previous = self.scrape_state[r['link']]
+            self.reused_pages.append({
+                'run': previous['run'],
+                'from_folder': previous['folder'],
+                'folder': folder,
+                'html_file': previous['html_file'],
+            })
+        else:
+            self.scrape_state[r['link']] = {
+                'sha256': html_sha256,
+                'run': Path(save_folder_path).name,
+                'folder': folder,
+                'html_file': html_file,
+            }
+
+    async def launch_browser(self, headless_browser:bool) -> None:
+        """
+        Starts Playwright and launches the Chromium browser shared by all scraping helpers,
+        so each company only opens a new context instead of a new browser. Also opens the
+        HTTP client used for static pages that don't need JavaScript.
 
         Args:
             headless_browser (bool): Whether to launch the browser in headless mode.
-            r (any): A row (typically a pandas Series) from the scraping metadata DataFrame.
-            folder_path (str): Directory where the scraped HTML pages will be saved.
 
         Returns:
             None
         """
 
-        await u.scrape_link_manu_wi_chromium(
-            headless_browser = headless_browser,
+        # the client is built first since it raises without the optional `h2` package.
+        self.http_client = httpx.AsyncClient(
+            http2 = True,
+            follow_redirects = True,
+            headers = c.SCRAPER_HTTP_HEADERS,
+        )
+        self.context_lock = asyncio.Lock()
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=headless_browser)
+
+    def storage_state_path(self, netloc:str) -> Path:
+        """
+        Returns the file where cookies and local storage for a domain are persisted between runs.
+
+        Args:
+            netloc (str): Domain the browser context belongs to.
+
+        Returns:
+            Path: Location of the domain's storage state JSON.
+        """
+
+        return Path(c.SCRAPER_STORAGE_STATE_FOLDER_PATH) / f"{netloc}.json"
+
+    async def get_context(self, url:str) -> BrowserContext:
+        """
+        Returns the browser context for the URL's domain, creating it on first use. New
+        contexts are seeded with the storage state saved by a previous run, so cookies and
+        consent/geo interstitials carry over, and the same context keeps connections and
+        DNS warm for every later page of that domain.
+
+        Args:
+            url (str): URL that is about to be scraped.
+
+        Returns:
+            BrowserContext: Context shared by all pages of the URL's domain.
+        """
+
+        netloc = urlsplit(url).netloc
+        async with self.context_lock:
+            if netloc not in self.contexts:
+                storage_state_path = self.storage_state_path(netloc=netloc)
+                self.contexts[netloc] = await u.new_chromium_context(
+                    browser = self.browser,
+                    ignore_https_errors = True,
+                    storage_state = storage_state_path if storage_state_path.exists() else None,
+                )
+        return self.contexts[netloc]
+
+    async def close_browser(self) -> None:
+        """
+        Saves the storage state of every domain context, closes them and the shared browser,
+        stops Playwright, and closes the shared HTTP client.
+
+        Returns:
+            None
+        """
+
+        self.folder_exists_or_mk(folder_path=c.SCRAPER_STORAGE_STATE_FOLDER_PATH)
+        for netloc, context in self.contexts.items():
+            await context.storage_state(path=self.storage_state_path(netloc=netloc))
+            await context.close()
+        self.contexts = {}
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    async def call_scrape_link_manu_wi_chromium(self, r:dict, save_dir:Path, previous_sha256:(str | None)) -> (str | None):
+        """
+        Wrapper to call the paginated scraper function using Chromium for a given row of scraping metadata.
+
+        Args:
+            r (dict[str, str]): A row of the scraping metadata, keyed by CSV column.
+            save_dir (Path): Directory where the scraped HTML pages will be saved.
+            previous_sha256 (str | None): Content hash of the pages from the previous run.
+
+        Returns:
+            str | None: Content hash of the scraped pages, or None if none loaded.
+        """
+
+        return await u.scrape_link_manu_wi_chromium(
+            context = await self.get_context(url=r['link']),
             base_url = r['link'],
             page_identifier = r['page_identifier'],
-            num_pages = int(r['num_pages']),
-            save_folder_path = folder_path,
-            multiplier = int(r['mulriplier'])
+            num_pages = int(float(r['num_pages'])),
+            save_dir = save_dir,
+            multiplier = int(float(r['mulriplier'])),
+            previous_sha256 = previous_sha256
         )
     
-    async def call_scrape_static_wi_chromium(self, headless_browser:bool, r:any, folder_path:str) -> None:
+    async def call_scrape_static_wi_chromium(self, r:dict, save_dir:Path, previous_sha256:(str | None)) -> (str | None):
 
         """
         Wrapper to call the static page scraper function using Chromium for a given row of scraping metadata.
 
         Args:
-            headless_browser (bool): Whether to launch the browser in headless mode.
-            r (any): A row (typically a pandas Series) from the scraping metadata DataFrame.
-            folder_path (str): Directory where the scraped HTML content will be saved.
+            r (dict[str, str]): A row of the scraping metadata, keyed by CSV column.
+            save_dir (Path): Directory where the scraped HTML content will be saved.
+            previous_sha256 (str | None): Content hash of the page from the previous run.
 
         Returns:
-            None
+            str | None: Content hash of the scraped page, or None if it failed to load.
         """
 
-        await u.scrape_static_wi_chromium(
-            headless_browser = headless_browser,
+        return await u.scrape_static_wi_chromium(
+            context = await self.get_context(url=r['link']),
             base_url = r['link'],
-            save_folder_path = folder_path,
+            save_dir = save_dir,
+            previous_sha256 = previous_sha256,
         )
     
-    async def scrape(self, browser_name:str, headless_browser:bool, save_folder_path:str) -> None:
+    def needs_js(self, r:dict) -> bool:
         """
-        Main orchestration method to run the scraping pipeline. It iterates over all configured
-        companies and selects the appropriate scraping strategy based on metadata (scrolling, static, or paginated).
+        Checks the optional `needs_js` column of a row. Static pages default to a plain
+        HTTP fetch; only rows flagged here are rendered in Chromium.
 
         Args:
-            browser_name (str): Name of the browser to use (currently only 'chromium' is supported).
-            headless_browser (bool): Whether to run the browser in headless mode.
+            r (dict[str, str]): A row of the scraping metadata, keyed by CSV column.
+
+        Returns:
+            bool: True if the page must be rendered with JavaScript.
+        """
+
+        return (r.get('needs_js') or '').strip().lower() in {'1', 'true', 'yes', 'y'}
+
+    async def call_fetch_static_httpx(self, r:dict, save_dir:Path, previous_sha256:(str | None)) -> (str | None):
+        """
+        Wrapper to fetch a static page over HTTP, without a browser, for a given row of scraping metadata.
+
+        Args:
+            r (dict[str, str]): A row of the scraping metadata, keyed by CSV column.
+            save_dir (Path): Directory where the scraped HTML content will be saved.
+            previous_sha256 (str | None): Content hash of the page from the previous run.
+
+        Returns:
+            str | None: Content hash of the fetched page, or None if it failed to load.
+        """
+
+        return await u.fetch_static_httpx(
+            client = self.http_client,
+            base_url = r['link'],
+            save_dir = save_dir,
+            previous_sha256 = previous_sha256,
+        )
+
+    async def scrape_company(self, r:dict, save_folder_path:str, semaphore:asyncio.Semaphore) -> None:
+        """
+        Scrapes one company, selecting the appropriate scraping strategy based on its metadata
+        (scrolling, static, or paginated). Static pages are fetched over plain HTTP unless
+        the row sets `needs_js`. Pages unchanged since the previous run are not saved again
+        and are recorded for reuse instead. Waits on `semaphore` so only a bounded number of
+        companies are scraped at the same time.
+
+        Args:
+            r (dict[str, str]): A row of the scraping metadata, keyed by CSV column.
             save_folder_path (str): Root directory where all scraping results will be saved.
+            semaphore (asyncio.Semaphore): Limits how many companies are scraped concurrently.
 
         Returns:
             None
         """
 
-        if browser_name == "chromium":
+        async with semaphore:
+            print(f"Starting to scrape {r['company']}...")
+            save_dir = Path(save_folder_path) / r['company'] / (r.get('link_type') or '')
+            self.folder_exists_or_mk(folder_path=save_dir)
 
-            for _, r in self.scraping_info_df.iterrows():
-                print(f"Starting to scrape {r['company']}...")
-                if r['link_identifier'] == 'scroll':
-                    folder_path = f"{save_folder_path}/{r['company']}/{r['link_type']}/"
-                    self.folder_exists_or_mk(folder_path=folder_path)
-                    await u.scrape_scroll_wi_chromium(
-                        headless_browser = headless_browser,
-                        base_url = r['link'],
-                        save_folder_path = f"{save_folder_path}/{r['company']}/{r['link_type']}/"
-                    )
-                
-                elif pd.isna(r['link_type']):
-                    folder_path = f"{save_folder_path}/{r['company']}/"
-                    self.folder_exists_or_mk(folder_path=folder_path)
-                    
-                    await self.call_scrape_static_wi_chromium(
-                        headless_browser = headless_browser,
+            previous = self.scrape_state.get(r['link'])
+            previous_sha256 = None
+            if previous is not None and self.previous_extraction_exists(previous=previous):
+                previous_sha256 = previous['sha256']
+
+            if r['link_identifier'] == 'scroll':
+                html_file = c.SCRAPER_PAGE_FILE_NAME
+                html_sha256 = await u.scrape_scroll_wi_chromium(
+                    context = await self.get_context(url=r['link']),
+                    base_url = r['link'],
+                    save_dir = save_dir,
+                    previous_sha256 = previous_sha256
+                )
+            
+            elif not r.get('link_type'):
+                html_file = c.SCRAPER_PAGE_FILE_NAME
+                if self.needs_js(r=r):
+                    html_sha256 = await self.call_scrape_static_wi_chromium(
                         r = r,
-                        folder_path = folder_path
+                        save_dir = save_dir,
+                        previous_sha256 = previous_sha256
                     )
                 else:
-                    folder_path = f"{save_folder_path}/{r['company']}/{r['link_type']}/"
-                    self.folder_exists_or_mk(folder_path=folder_path)
-                    
-                    await self.call_scrape_link_manu_wi_chromium(
-                        headless_browser = headless_browser,
+                    html_sha256 = await self.call_fetch_static_httpx(
                         r = r,
-                        folder_path = folder_path
+                        save_dir = save_dir,
+                        previous_sha256 = previous_sha256
                     )
+            else:
+                html_file = c.SCRAPER_ARCHIVE_NAME
+                html_sha256 = await self.call_scrape_link_manu_wi_chromium(
+                    r = r,
+                    save_dir = save_dir,
+                    previous_sha256 = previous_sha256
+                )
+
+            self.record_page(
+                r = r,
+                save_folder_path = save_folder_path,
+                save_dir = save_dir,
+                html_file = html_file,
+                html_sha256 = html_sha256,
+                previous_sha256 = previous_sha256
+            )
+
+    async def scrape(self, browser_name:str, headless_browser:bool, save_folder_path:str) -> None:
+        """
+        Main orchestration method to run the scraping pipeline. It launches one browser and
+        scrapes all configured companies concurrently, at most `SCRAPER_CONCURRENCY` at a time.
+        Content hashes from earlier runs are loaded first and saved back at the end.
+
+        Args:
+            browser_name (str): Name of the browser to use (currently only 'chromium' is supported).
+            headless_browser (bool): Whether to run the browser in headless mode.
+            save_folder_path (str): Root directory where all scraping results will be saved.
+
+        Returns:
+            None
+        """
+
+        if browser_name == "chromium":
+
+            semaphore = asyncio.Semaphore(c.SCRAPER_CONCURRENCY)
+            self.load_scrape_state()
+            try:
+                await self.launch_browser(headless_browser=headless_browser)
+                results = await asyncio.gather(
+                    *(self.scrape_company(
+                        r = r,
+                        save_folder_path = save_folder_path,
+                        semaphore = semaphore
+                    ) for r in self.scraping_info),
+                    return_exceptions=True
+                )
+            finally:
+                await self.close_browser()
+            self.save_scrape_state(save_folder_path=save_folder_path)
+            for r, result in zip(self.scraping_info, results):
+                if isinstance(result, Exception):
+                    print(f"Error scraping {r['company']}: {result}")
 
         else:
             """TODO: build integration for other browsers too.
@@ -1,16 +1,24 @@
-from typing import Union, List
+from typing import Union, List, Iterator
 
-import json
-import csv
+import io
+import os
+import mmap
 import time
 import random
+import hashlib
+import asyncio
+import tarfile
 from pathlib import Path
+from contextlib import contextmanager
 
 import src.constants as c
 
-from playwright.async_api import async_playwright
-import requests
+from playwright.async_api import Browser, BrowserContext, Page, Route, TimeoutError as PlaywrightTimeoutError
+import httpx
 import base64
+import orjson
+import zstandard
+import pandas as pd
 
 
 
@@ -28,8 +36,8 @@ def save_data_as_txt(save_location:str, data:list[str]) -> None:
     """
 
     with open(save_location, "w") as file:
-        for i in range(len(data)):
-            file.write(f"{data[i]}\n")
+        if data:
+            file.write("\n".join(map(str, data)) + "\n")
 
 def save_response_as_txt(save_location:str, response:str) -> None:
     """
@@ -59,13 +67,9 @@ def save_data_as_csv(save_location:str, extraction_fields:list[str], data:list[s
         None
     """
 
-    with open(f"{save_location}", mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=extraction_fields)
-        writer.writeheader()
-        
-        for dictionary_string in data:
-            dictionary = json.loads(dictionary_string)
-            writer.writerow(dictionary)
+    records = [orjson.loads(dictionary_string) for dictionary_string in data]
+    # object dtype keeps each value as parsed; otherwise ints in a column with missing fields are written as floats.
+    pd.DataFrame(records, columns=extraction_fields, dtype=object).to_csv(save_location, index=False)
 
 def save_html(save_location:str, html_data:str, encoding:str='utf-8') -> None:
     """
@@ -83,6 +87,20 @@ def save_html(save_location:str, html_data:str, encoding:str='utf-8') -> None:
     with open(save_location, 'w', encoding=encoding) as f:
         f.write(html_data)
 
+def save_html_bytes(save_location:Path, html_data:bytes) -> None:
+    """
+    Writes already-encoded HTML content to a file, skipping the text-mode re-encode of `save_html`.
+
+    Args:
+        save_location (Path): Path to save the HTML file.
+        html_data (bytes): The encoded HTML content to write.
+
+    Returns:
+        None
+    """
+
+    save_location.write_bytes(html_data)
+
 def read_html(HTML_file_path:str, encoding:str='utf-8') -> str:
     """
     Reads an HTML file and returns its content as a string.
@@ -98,6 +116,112 @@ def read_html(HTML_file_path:str, encoding:str='utf-8') -> str:
     with open(HTML_file_path, 'r', encoding=encoding) as file:
         return file.read()
 
+@contextmanager
+def map_html(HTML_file_path:str):
+    """
+    Memory-maps an HTML file read-only so it can be searched and sliced as bytes
+    without reading the whole file into memory.
+
+    Args:
+        HTML_file_path (str): Path to the HTML file.
+
+    Yields:
+        mmap.mmap | bytes: Read-only view of the file content. Empty files yield b"" since they cannot be mapped.
+    """
+
+    with open(HTML_file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as html_content:
+            yield html_content
+
+@contextmanager
+def write_html_archive(archive_path:Path):
+    """
+    Opens a zstd-compressed tar archive to stream scraped HTML pages into.
+
+    Args:
+        archive_path (Path): Path of the `.tar.zst` archive to create.
+
+    Yields:
+        tarfile.TarFile: Archive open for sequential writes; pages are added with `add_html_to_archive`.
+    """
+
+    with open(archive_path, 'wb') as file, \
+            zstandard.ZstdCompressor(level=c.SCRAPER_ARCHIVE_ZSTD_LEVEL).stream_writer(file) as zstd_writer, \
+            tarfile.open(fileobj=zstd_writer, mode='w|') as archive:
+        yield archive
+
+def add_html_to_archive(archive:tarfile.TarFile, html_name:str, html_data:bytes) -> None:
+    """
+    Appends one HTML page to an archive opened with `write_html_archive`.
+
+    Args:
+        archive (tarfile.TarFile): Archive to append to.
+        html_name (str): Name of the page inside the archive.
+        html_data (bytes): The encoded HTML content to write.
+
+    Returns:
+        None
+    """
+
+    member = tarfile.TarInfo(name=html_name)
+    member.size = len(html_data)
+    member.mtime = int(time.time())
+    archive.addfile(member, io.BytesIO(html_data))
+
+def save_html_archive(archive_path:Path, pages_html:List[Union[bytes, None]]) -> None:
+    """
+    Writes a list of pages to a new archive, naming each one after its position in the list.
+
+    Args:
+        archive_path (Path): Path of the `.tar.zst` archive to create.
+        pages_html (List[bytes | None]): Encoded HTML of each page, in page order. Pages that failed to load are None and are skipped.
+
+    Returns:
+        None
+    """
+
+    with write_html_archive(archive_path=archive_path) as archive:
+        for n, html_data in enumerate(pages_html):
+            if html_data is not None:
+                add_html_to_archive(archive=archive, html_name=f"{n}.html", html_data=html_data)
+
+def iter_html_archive(archive_path:str) -> Iterator[tuple[str, bytes]]:
+    """
+    Lazily reads the pages of an archive written with `write_html_archive`.
+
+    Args:
+        archive_path (str): Path of the `.tar.zst` archive.
+
+    Yields:
+        tuple[str, bytes]: Name and raw content of each page, in the order they were scraped.
+    """
+
+    with open(archive_path, 'rb') as file, \
+            zstandard.ZstdDecompressor().stream_reader(file) as zstd_reader, \
+            tarfile.open(fileobj=zstd_reader, mode='r|') as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, archive.extractfile(member).read()
+
+def extracted_file_pattern(html_file:str) -> str:
+    """
+    Returns the glob pattern matching the extractor's outputs for one scraped HTML file or archive.
+
+    Args:
+        html_file (str): Name of the scraped HTML file or `SCRAPER_ARCHIVE_NAME` archive.
+
+    Returns:
+        str: Glob pattern of the `extracted_*_part_*.txt` files generated from it.
+    """
+
+    if html_file == c.SCRAPER_ARCHIVE_NAME:
+        # archive pages are named by their page number, see `save_html_archive`.
+        return "extracted_[0-9]*_part_*.txt"
+    return f"extracted_{html_file.rsplit('.', 1)[0]}_part_*.txt"
+
 
 
 
@@ -106,118 +230,260 @@ def read_html(HTML_file_path:str, encoding:str='utf-8') -> str:
 #### SCRAPER Helper Functions ####
 ##################################
 
-async def scrape_link_manu_wi_chromium(headless_browser:bool, base_url:str, page_identifier:str, num_pages:int, save_folder_path:str, multiplier:int) -> None:
+async def block_heavy_resources(route:Route) -> None:
     """
-    Scrapes multiple pages by manipulating a paginated URL and saves each page’s HTML content.
+    Route handler that aborts requests for resources the HTML extraction never uses
+    (see `SCRAPER_BLOCKED_RESOURCE_TYPES`) and lets everything else through.
 
     Args:
-        headless_browser (bool): Whether to run the browser in headless mode.
-        base_url (str): Base URL template with a placeholder for pagination.
-        page_identifier (str): Identifier to locate the pagination point in the URL.
-        num_pages (int): Number of pages to scrape.
-        save_folder_path (str): Directory where HTML files will be saved.
-        multiplier (int): Multiplier to control pagination logic.
+        route (Route): Intercepted Playwright request.
 
     Returns:
         None
     """
 
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=headless_browser)
-        context = await browser.new_context(java_script_enabled=True, ignore_https_errors=True)
-        page = await context.new_page()
+    if route.request.resource_type in c.SCRAPER_BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def new_chromium_context(browser:Browser, **context_kwargs) -> BrowserContext:
+    """
+    Opens a JavaScript-enabled browser context that skips images, media and fonts.
+
+    Args:
+        browser (Browser): Already launched Chromium browser to open the context in.
+        **context_kwargs: Extra keyword arguments forwarded to `browser.new_context`.
+
+    Returns:
+        BrowserContext: The new context with the resource filter installed.
+    """
 
-        for n in range(num_pages):
-            try:
-                time.sleep(random.randint(4, 8))
-                base_url_ext = base_url.replace(f"{page_identifier}", f"{page_identifier}{n*multiplier if multiplier > 1 else n+1}")
-                await page.goto(base_url_ext, wait_until='load')
-                await page.wait_for_timeout(5000)
-                html_to_save = await page.content()
-                save_html(
-                    save_location=f"{save_folder_path}{n}.txt",
-                    html_data=html_to_save,
-                )
-            except:
-                print(f"Error loading page {base_url_ext}")
-        await context.close()
-        await browser.close()
+    context = await browser.new_context(java_script_enabled=True, **context_kwargs)
+    await context.route("**/*", block_heavy_resources)
+    return context
 
-async def scrape_static_wi_chromium(headless_browser:bool, base_url:str, save_folder_path:str) -> None:
+async def wait_for_network_idle(page:Page, timeout:int) -> None:
     """
-    Loads a static web page using Chromium and saves the HTML content to a file.
+    Waits until the page has no network activity, for at most `timeout` milliseconds.
+
+    Pages that keep polling never go idle; for those the timeout is simply the wait.
 
     Args:
-        headless_browser (bool): Whether to run the browser in headless mode.
-        base_url (str): URL of the static page to scrape.
-        save_folder_path (str): File path prefix to save the HTML file.
+        page (Page): Playwright page to wait on.
+        timeout (int): Maximum time to wait, in milliseconds.
 
     Returns:
         None
     """
 
-    async with async_playwright() as playwright:
+    try:
+        await page.wait_for_load_state('networkidle', timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+
+async def save_html_if_changed(save_location:Path, html_data:bytes, previous_sha256:Union[str, None]) -> str:
+    """
+    Saves a scraped page unless its content hash matches the one recorded by a previous run,
+    in which case the earlier HTML (and its extraction) is reused instead.
+
+    Args:
+        save_location (Path): Path to save the HTML file.
+        html_data (bytes): The encoded HTML content to write.
+        previous_sha256 (str | None): SHA-256 of the page from the previous run, if any.
+
+    Returns:
+        str: SHA-256 hex digest of `html_data`.
+    """
+
+    html_sha256 = hashlib.sha256(html_data).hexdigest()
+    if html_sha256 != previous_sha256:
+        await asyncio.to_thread(
+            save_html_bytes,
+            save_location=save_location,
+            html_data=html_data,
+        )
+    return html_sha256
+
+async def fetch_paginated_page(context:BrowserContext, url:str, semaphore:asyncio.Semaphore) -> Union[bytes, None]:
+    """
+    Loads one page of a paginated listing in its own tab and returns its HTML content.
+
+    Args:
+        context (BrowserContext): Browser context shared by all pages of the site's domain.
+        url (str): URL of the page to load.
+        semaphore (asyncio.Semaphore): Limits how many pages of the site are open at the same time.
+
+    Returns:
+        bytes | None: UTF-8 encoded HTML of the page, or None if it failed to load.
+    """
+
+    async with semaphore:
+        page = await context.new_page()
         try:
-            browser = await playwright.chromium.launch(headless=headless_browser)
-            context = await browser.new_context(java_script_enabled=True)
-            page = await context.new_page()
-            await page.goto(base_url)
-            await page.wait_for_timeout(20000)
+            await asyncio.sleep(random.uniform(4, 8))
+            await page.goto(url, wait_until='load')
+            await wait_for_network_idle(page=page, timeout=5000)
             html_to_save = await page.content()
-            save_html(
-                save_location=f"{save_folder_path}.txt",
-                html_data=html_to_save,
-            )
-            await context.close()
-            await browser.close()
-        except:
-            print(f"Error loading page {base_url}")
+            return html_to_save.encode('utf-8', 'replace')
+        except Exception:
+            print(f"Error loading page {url}")
+            return None
+        finally:
+            await page.close()
+
+async def scrape_link_manu_wi_chromium(context:BrowserContext, base_url:str, page_identifier:str, num_pages:int, save_dir:Path, multiplier:int, previous_sha256:Union[str, None]=None) -> Union[str, None]:
+    """
+    Scrapes multiple pages by manipulating a paginated URL and streams each page’s HTML content
+    into a single zstd-compressed tar archive (`SCRAPER_ARCHIVE_NAME`) instead of one file per page.
+    Pages are loaded concurrently in separate tabs, at most `SCRAPER_PAGE_CONCURRENCY` at a time,
+    and written to the archive in page order once all of them have loaded. The archive is not
+    written when the pages hash to `previous_sha256`.
+
+    Args:
+        context (BrowserContext): Browser context shared by all pages of the site's domain.
+        base_url (str): Base URL template with a placeholder for pagination.
+        page_identifier (str): Identifier to locate the pagination point in the URL.
+        num_pages (int): Number of pages to scrape.
+        save_dir (Path): Directory where the HTML archive will be saved.
+        multiplier (int): Multiplier to control pagination logic.
+        previous_sha256 (str | None, optional): SHA-256 of the pages from the previous run. Defaults to None.
+
+    Returns:
+        str | None: SHA-256 hex digest over all pages, in page order, or None if no page loaded.
+    """
+
+    semaphore = asyncio.Semaphore(c.SCRAPER_PAGE_CONCURRENCY)
+    pages_html = await asyncio.gather(
+        *(fetch_paginated_page(
+            context = context,
+            url = base_url.replace(f"{page_identifier}", f"{page_identifier}{n*multiplier if multiplier > 1 else n+1}"),
+            semaphore = semaphore,
+        ) for n in range(num_pages))
+    )
+
+    pages_sha256 = hashlib.sha256()
+    for html_data in pages_html:
+        # each page is length-prefixed so page boundaries and failed pages change the digest too.
+        pages_sha256.update(b"-1:" if html_data is None else f"{len(html_data)}:".encode() + html_data)
+    pages_sha256 = pages_sha256.hexdigest()
+
+    if pages_sha256 != previous_sha256:
+        await asyncio.to_thread(
+            save_html_archive,
+            archive_path=save_dir / c.SCRAPER_ARCHIVE_NAME,
+            pages_html=pages_html,
+        )
+    return pages_sha256 if any(html_data is not None for html_data in pages_html) else None
+
+async def scrape_static_wi_chromium(context:BrowserContext, base_url:str, save_dir:Path, previous_sha256:Union[str, None]=None) -> Union[str, None]:
+    """
+    Loads a static web page using Chromium and saves the HTML content to a file, unless it is unchanged
+    since the previous run.
+
+    Args:
+        context (BrowserContext): Browser context shared by all pages of the site's domain.
+        base_url (str): URL of the static page to scrape.
+        save_dir (Path): Directory where the HTML file (`SCRAPER_PAGE_FILE_NAME`) will be saved.
+        previous_sha256 (str | None, optional): SHA-256 of the page from the previous run. Defaults to None.
+
+    Returns:
+        str | None: SHA-256 hex digest of the page, or None if it failed to load.
+    """
+
+    page = await context.new_page()
+    try:
+        await page.goto(base_url)
+        await wait_for_network_idle(page=page, timeout=20000)
+        html_to_save = await page.content()
+        return await save_html_if_changed(
+            save_location=save_dir / c.SCRAPER_PAGE_FILE_NAME,
+            html_data=html_to_save.encode('utf-8', 'replace'),
+            previous_sha256=previous_sha256,
+        )
+    except Exception:
+        print(f"Error loading page {base_url}")
+        return None
+    finally:
+        await page.close()
+
+async def fetch_static_httpx(client:httpx.AsyncClient, base_url:str, save_dir:Path, previous_sha256:Union[str, None]=None) -> Union[str, None]:
+    """
+    Fetches a server-rendered page over HTTP and saves the HTML content to a file, for
+    static pages that don't need a real browser to render their listings. The file is not
+    written when the page is unchanged since the previous run.
+
+    Args:
+        client (httpx.AsyncClient): Keep-alive HTTP client shared by all static pages.
+        base_url (str): URL of the static page to fetch.
+        save_dir (Path): Directory where the HTML file (`SCRAPER_PAGE_FILE_NAME`) will be saved.
+        previous_sha256 (str | None, optional): SHA-256 of the page from the previous run. Defaults to None.
+
+    Returns:
+        str | None: SHA-256 hex digest of the page, or None if it failed to load.
+    """
 
-async def scrape_scroll_wi_chromium(headless_browser:bool, base_url:str, save_folder_path:str) -> None:
+    try:
+        response = await client.get(base_url, timeout=c.SCRAPER_HTTP_TIMEOUT)
+        response.raise_for_status()
+        # the body is stored as-is when it is already UTF-8, which is what the extractor reads.
+        is_utf8 = (response.encoding or 'utf-8').lower().replace('_', '-') in {'utf-8', 'utf8', 'ascii'}
+        return await save_html_if_changed(
+            save_location=save_dir / c.SCRAPER_PAGE_FILE_NAME,
+            html_data=response.content if is_utf8 else response.text.encode('utf-8', 'replace'),
+            previous_sha256=previous_sha256,
+        )
+    except Exception:
+        print(f"Error loading page {base_url}")
+        return None
+
+async def scrape_scroll_wi_chromium(context:BrowserContext, base_url:str, save_dir:Path, previous_sha256:Union[str, None]=None) -> str:
     """
     Scrolls through a dynamically loaded web page to trigger lazy-loaded content, then saves the HTML.
+    Scrolling runs inside the page (`SCRAPER_SCROLL_TO_BOTTOM_JS`) and stops as soon as the page height stops
+    growing, instead of pressing a key a fixed number of times. The file is not written when the
+    page is unchanged since the previous run.
 
     Args:
-        headless_browser (bool): Whether to run the browser in headless mode.
+        context (BrowserContext): Browser context shared by all pages of the site's domain.
         base_url (str): URL of the dynamic, scrollable page.
-        save_folder_path (str): Path to save the HTML content.
+        save_dir (Path): Directory where the HTML file (`SCRAPER_PAGE_FILE_NAME`) will be saved.
+        previous_sha256 (str | None, optional): SHA-256 of the page from the previous run. Defaults to None.
 
     Returns:
-        None
+        str: SHA-256 hex digest of the page.
     """
 
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=headless_browser)
-        context = await browser.new_context(java_script_enabled=True)
-        page = await context.new_page()
+    page = await context.new_page()
+    # the context is shared for the whole run, so the tab is closed even when the scrape fails.
+    try:
         await page.goto(base_url, wait_until='load')
-        time.sleep(random.randint(5, 7))
+        await asyncio.sleep(random.uniform(5, 7))
         try:
-            for _ in range(100):
-                await page.keyboard.press('Space')
-                time.sleep(random.randint(2, 4))
-            new_height = await page.evaluate("document.body.scrollHeight")
-
-            time.sleep(random.randint(2, 5))
-        except:
+            await page.evaluate(
+                c.SCRAPER_SCROLL_TO_BOTTOM_JS,
+                [c.SCRAPER_SCROLL_INTERVAL_MS, c.SCRAPER_SCROLL_STABLE_CHECKS, c.SCRAPER_SCROLL_MAX_MS],
+            )
+        except Exception:
             print(f"Did not finish loading page {base_url}")
-            keep_scrolling = False
 
-        await page.wait_for_timeout(5000)
+        await wait_for_network_idle(page=page, timeout=5000)
         html_to_save = await page.content()
-        save_html(
-            save_location=f"{save_folder_path}.txt",
-            html_data=html_to_save,
+        return await save_html_if_changed(
+            save_location=save_dir / c.SCRAPER_PAGE_FILE_NAME,
+            html_data=html_to_save.encode('utf-8', 'replace'),
+            previous_sha256=previous_sha256,
         )
-        await context.close()
-        await browser.close()
+    finally:
+        await page.close()
 
 
-def download_image(url, file_name):
+async def download_image(client:httpx.AsyncClient, url:str, file_name:str) -> None:
     """
     Downloads an image from a URL and saves it to the specified file path.
 
     Args:
+        client (httpx.AsyncClient): HTTP client whose connection pool is shared across downloads.
         url (str): Direct URL to the image.
         file_name (str): Destination file path to save the image.
 
@@ -225,16 +491,30 @@ def download_image(url, file_name):
         None
     """
 
-    response = requests.get(url)
+    response = await client.get(url)
     if response.status_code == 200:
-        with open(file_name, 'wb') as f:
-            f.write(response.content)
+        await asyncio.to_thread(Path(file_name).write_bytes, response.content)
     else:
         print(f"Failed to download image: {response.status_code}")
 
+async def download_images(images:List[tuple[str, str]]) -> None:
+    """
+    Downloads a batch of images concurrently over one shared HTTP/2 connection pool.
+
+    Args:
+        images (List[tuple[str, str]]): Pairs of (image URL, destination file path).
+
+    Returns:
+        None
+    """
+
+    async with httpx.AsyncClient(http2=True, timeout=c.SCRAPER_HTTP_TIMEOUT, follow_redirects=True) as client:
+        await asyncio.gather(*(download_image(client=client, url=url, file_name=file_name) for url, file_name in images))
+
 def encode_image(image_path):
     """
-    Encodes an image file in Base64 format.
+    Encodes an image file in Base64 format, reading and encoding it in fixed-size chunks
+    rather than loading the whole file at once.
 
     Args:
         image_path (str): Path to the image file to encode.
@@ -243,5 +523,9 @@ def encode_image(image_path):
         str: Base64-encoded string of the image.
     """
     
+    # chunks are a multiple of 3 bytes, so every chunk encodes without padding and the pieces concatenate cleanly.
+    encoded = io.BytesIO()
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
\ No newline at end of file
+        for chunk in iter(lambda: image_file.read(c.ENCODE_IMAGE_CHUNK_SIZE), b""):
+            encoded.write(base64.b64encode(chunk))
+    return encoded.getvalue().decode('ascii')
\ No newline at end of file